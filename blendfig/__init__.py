@@ -2,9 +2,15 @@ from .traces.trace import Trace
 from .traces.surface import Surface
 from .traces.scatter import Scatter
 from .traces.bar import Bar
+from .traces.isosurface import Isosurface
+from .traces.merged import MergedScatter
 from .bounds.bounds import Bounds
 from .axes.axes import Axes
+from .registry.registry import Registry
+from .live.live import LiveUpdater
 from .materials.colors import COLORS, cycle
+from .tools.functions import get_column, group_indices
+import numpy as np
 
 FIGURE_SIZE = 100
 __version__ = '0.1.3'
@@ -16,10 +22,45 @@ class Figure:
         
         self.traces = {}
         self.bounds = None
+        self.statistics = None
         self.ax = None
+        self.merged = None
+        self._create_options = {} # options of the last create call, reused by redraw
         
         self.trace_colors = {}        
 
+    @classmethod
+    def from_dataframe(cls, data, x=None, y=None, z=None, group_by=None, trace=Scatter, **kwargs):
+        """ Create a figure from the columns of a pandas DataFrame, pyarrow Table or dict of arrays.
+            x, y, z are column names. If group_by is given one trace is created for each value of that column.
+            Remaining keyword arguments are passed on to the trace. """
+        
+        figure = cls()
+        columns = {axis: get_column(data, name) for axis, name in zip('xyz', (x, y, z)) if name is not None}
+        
+        if group_by is None:
+            figure.add_trace(trace(**columns, **kwargs))
+            return figure
+        
+        # sort the rows by group once so that each group is a contiguous slice
+        group_column = data[group_by]
+        if hasattr(group_column, 'cat'):
+            
+            # group categoricals by their codes and name the groups by their categories, missing values (code -1) last
+            labels = np.append(group_column.cat.categories.to_numpy(dtype=object), np.nan)
+            codes = group_column.cat.codes.to_numpy()
+            keys, order, starts = group_indices(np.where(codes < 0, len(labels) - 1, codes))
+            keys = labels[keys]
+        else:
+            keys, order, starts = group_indices(get_column(data, group_by))
+        columns = {axis: column[order] for axis, column in columns.items()}
+        
+        for key, start, stop in zip(keys, starts[:-1], starts[1:]):
+            group_columns = {axis: column[start:stop] for axis, column in columns.items()}
+            figure.add_trace(trace(**group_columns, name=f"{group_by}={key}", **kwargs))
+        
+        return figure
+
     def add_trace(self, trace: Trace) -> None:
         
         # add trace to the trace dictionary
@@ -35,28 +76,67 @@ class Figure:
         if trace_type not in self.trace_colors:
             self.trace_colors[trace_type] = cycle(COLORS)
         if not trace.color:
-            color = next(self.colors[trace_type])
-            trace.color = color
-            print(color)
-        
-        # update bounding box and axes
-        if self.bounds:
-            self.bounds.update(trace.bounds)
-            # self.ax.update(self.bounds)
+            trace.color = next(self.trace_colors[trace_type])
+        
+        # update bounding box from the cached statistics of the trace without scanning its data
+        if self.statistics:
+            self.statistics = self.statistics.merge(trace.statistics)
         else:
-            self.bounds = trace.bounds
-            # self.axes = Axes(self.bounds)
+            self.statistics = trace.statistics
+        self.bounds = Bounds._from_statistics(self.statistics)
 
         
             
-    def create(self):
+    def create(self, merge=False, gridlines=False):
+        """ Draw the figure. With merge=True all Scatter traces are drawn as a single object,
+            see MergedScatter for toggling individual traces afterwards. """
+        
+        self._create_options = {'merge': merge, 'gridlines': gridlines}
         
         # creates the geometry for the figure
-        for trace_type_list in self.traces.values():
+        for trace_type, trace_type_list in self.traces.items():
+            
+            if merge and trace_type is Scatter:
+                self.merged = MergedScatter(trace_type_list)
+                self.merged.draw()
+                continue
+            
             for trace in trace_type_list:
         
                 trace.draw()
         
+        # bounds of the drawn data if the traces were rescaled
+        rescaled = [trace.bounds.rescaled for trace_type_list in self.traces.values() for trace in trace_type_list if hasattr(trace.bounds, 'rescaled')]
+        if rescaled:
+            self.bounds.rescaled = Bounds(rescaled[0].bounds)
+            for bounds in rescaled[1:]:
+                self.bounds.rescaled.update(bounds)
+        
         # draw axes
-        self.ax = Axes(self.bounds)
-        self.ax.draw()
\ No newline at end of file
+        self.ax = Axes(self.bounds, gridlines=gridlines)
+        self.ax.draw()
+
+    def clear(self):
+        """ Remove everything drawn for the figure in a single batch.
+            Returns a report of the removed datablocks per type and the estimated memory reclaimed in bytes. """
+        
+        registry = Registry()
+        for trace_type_list in self.traces.values():
+            for trace in trace_type_list:
+                registry.absorb(trace.registry)
+                trace._forget_drawn()
+        if self.merged is not None:
+            registry.absorb(self.merged.registry)
+            self.merged._forget_drawn()
+        if self.ax is not None:
+            registry.absorb(self.ax.registry)
+        
+        return registry.clear()
+    
+    def redraw(self):
+        """ Clear the figure and draw it again with the same options """
+        
+        report = self.clear()
+        self.create(**self._create_options)
+        
+        return report
@@ -1,52 +1,76 @@
-from ..geometry.geometry import add_box
+from ..geometry.geometry import mesh_from_arrays
 from ..bounds.bounds import Bounds
+from ..registry.registry import Registry
 import numpy as np
 import bpy
 
+# tick label placement for each axis: rotation, horizontal alignment and the direction
+# (+1/-1 along the axis) in which consecutive lines of a text object are laid out
+TICK_LABEL_LAYOUT = (
+    ((0, 0, np.pi/2), 'LEFT', 1),
+    ((0, 0, np.pi), 'RIGHT', 1),
+    ((np.pi/2, 0, 3*np.pi/4), 'RIGHT', -1),
+)
+
+# Blender clamps TextCurve.space_line to this many times the text size
+MAX_SPACE_LINE = 10
+
 class Axes:
     """ Object for storing information about and drawing the axes. """
     
-    def __init__(self, bounds, ticks='auto'):
+    def __init__(self, bounds, ticks='auto', gridlines=False):
         
         self.bounds = bounds
 
         self.ticks = ticks
         self.num_ticks = (10,10,6)
+        self.gridlines = gridlines
+        
+        self.registry = Registry() # drawn datablocks, replaced on redraw
     
     def update(self, bounds):
         
         self.bounds = bounds
         
     def draw(self):
+        """ Draw the box, gridlines and tick labels. The lines form a single mesh and the labels of each axis a single text object. """
         
-        if hasattr(self.bounds, 'rescaled'):
-            add_box(*self.bounds.rescaled.bounds)
-        else:
-            add_box(*self.bounds.bounds)
-
-        bpy.ops.object.mode_set(mode='EDIT')
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.object.mode_set(mode='OBJECT')
-        bpy.context.object.data.vertices[-1].select = True
-        bpy.ops.object.mode_set(mode='EDIT')
-        bpy.ops.mesh.delete(type='VERT')
-        bpy.ops.object.mode_set(mode='OBJECT')
+        self.clear()
+        
+        bounds = np.array(self.bounds.bounds, dtype=float)
+        physical_bounds = np.array(self.bounds.rescaled.bounds if hasattr(self.bounds, 'rescaled') else self.bounds.bounds, dtype=float)
+        
+        # tick values and their location in the drawn figure
+        ticks, tick_locations = [], []
+        for axis in range(3):
+            
+            # if no input calculate ticks auomatically, otherwise take from input
+            axis_ticks = automatic_ticks(*bounds[axis], num_ticks=self.num_ticks[axis]) if self.ticks == 'auto' else np.asarray(self.ticks[axis], dtype=float)
+            locations = map_range(axis_ticks, bounds[axis], physical_bounds[axis])
+            
+            # drop ticks outside of the box
+            epsilon = 1e-9 * max(np.ptp(physical_bounds), 1)
+            inside = (locations >= physical_bounds[axis, 0] - epsilon) & (locations <= physical_bounds[axis, 1] + epsilon)
+            ticks.append(axis_ticks[inside])
+            tick_locations.append(locations[inside])
+        
+        vertices, edges = box_lines(physical_bounds)
+        if self.gridlines:
+            grid_vertices, grid_edges = grid_lines(physical_bounds, tick_locations)
+            edges = np.concatenate((edges, grid_edges + len(vertices)))
+            vertices = np.concatenate((vertices, grid_vertices))
+        
+        self.registry.register(mesh_from_arrays('Axes', vertices, edges=edges))
         
         # draw ticks
         if self.ticks:
-
             for axis in range(3):
-                
-                # if no input calculate ticks auomatically
-                physical_bounds = self.bounds.bounds if not hasattr(self.bounds, 'rescaled') else self.bounds.rescaled.bounds
-                if self.ticks == 'auto':
-                    ticks = automatic_ticks(*self.bounds.bounds[axis], num_ticks=self.num_ticks[axis])
-                    tick_locations = automatic_ticks(*physical_bounds[axis], num_ticks=self.num_ticks[axis])
-                # otherwise take from input    
-                else:
-                    ticks = self.ticks[axis]
-                
-                add_ticks(ticks, tick_locations, axis, bounds=physical_bounds)
+                self.registry.register(*add_tick_labels(ticks[axis], tick_locations[axis], axis, bounds=physical_bounds))
+    
+    def clear(self):
+        """ Remove the drawn objects and their data. Returns a report of the removed datablocks. """
+        
+        return self.registry.clear()
 
 def nice_number(value, round=False):
     
@@ -78,7 +102,7 @@ def automatic_ticks(min_val, max_val, num_ticks=10):
 
     axis_width = max_val - min_val
     if axis_width == 0:
-        nice_tick = 0
+        return np.array([min_val], dtype=float)
     else:
         nice_range = nice_number(axis_width)
         nice_tick = nice_number(nice_range / (num_ticks - 1), round=True)
@@ -93,31 +117,108 @@ def automatic_ticks(min_val, max_val, num_ticks=10):
     
     return ticks
     
-def add_ticks(ticks, tick_locations, axis, bounds, size = .5, offset = .2):
+def map_range(values, input_range, output_range):
+    """ Linearly map values from the input range to the output range """
+    
+    input_min, input_max = input_range
+    output_min, output_max = output_range
+    
+    if input_max == input_min:
+        return np.full(np.shape(values), output_min, dtype=float)
+    
+    return output_min + (np.asarray(values) - input_min) * (output_max - output_min) / (input_max - input_min)
+
+def box_lines(bounds):
+    """ Vertices and edges of a box with the corner at (xmax, ymax, zmax) left open """
+    
+    # corner index = dx + 2*dy + 4*dz
+    corners = np.array([(dx, dy, dz) for dz in (0, 1) for dy in (0, 1) for dx in (0, 1)])
+    vertices = np.asarray(bounds)[np.arange(3), corners]
+    
+    # edges join corners differing along one axis, skipping the open corner
+    start, bit = np.meshgrid(np.arange(7), (1, 2, 4), indexing='ij')
+    start, bit = start.ravel(), bit.ravel()
+    keep = ((start & bit) == 0) & ((start | bit) != 7)
+    edges = np.column_stack((start[keep], (start | bit)[keep]))
+    
+    return vertices[:7], edges
+
+def grid_lines(bounds, tick_locations):
+    """ Vertices and edges of gridlines at the tick locations on the three back planes of the box """
+    
+    bounds = np.asarray(bounds)
+    starts, ends = [], []
+    for normal in range(3):
+        for axis in range(3):
+            
+            if axis == normal:
+                continue
+            
+            # lines on the plane normal = min running across the remaining direction
+            across = 3 - normal - axis
+            start = np.empty((len(tick_locations[axis]), 3))
+            start[:, normal] = bounds[normal, 0]
+            start[:, axis] = tick_locations[axis]
+            start[:, across] = bounds[across, 0]
+            end = start.copy()
+            end[:, across] = bounds[across, 1]
+            
+            starts.append(start)
+            ends.append(end)
+    
+    starts, ends = np.concatenate(starts), np.concatenate(ends)
+    vertices = np.concatenate((starts, ends))
+    edges = np.column_stack((np.arange(len(starts)), np.arange(len(starts)) + len(starts)))
+    
+    return vertices, edges
+
+def add_tick_labels(ticks, tick_locations, axis, bounds, size = .5, offset = .2):
+    """ Add the tick labels of one axis. Evenly spaced ticks are written as the lines of a single text object,
+        unless they are further apart than the line spacing allows. """
     
     xmin, xmax = bounds[0]
     ymin, ymax = bounds[1]
     zmin, zmax = bounds[2]
     
     if axis == 0:
-        rotation = (0, 0 ,np.pi/2)
-        initial_location = [0, ymax + offset, zmin]
+        location = np.array([0, ymax + offset, zmin])
     elif axis == 1:
-        rotation = (0, 0, np.pi)
-        initial_location = [xmax + offset , 0, zmin]
+        location = np.array([xmax + offset , 0, zmin])
     elif axis == 2:
-        rotation = (np.pi/2, 0, 3*np.pi/4)
-        initial_location = [xmax + offset/3, ymin - offset/3, 0]
+        location = np.array([xmax + offset/3, ymin - offset/3, 0])
+    rotation, align_x, direction = TICK_LABEL_LAYOUT[axis]
+    
+    if not len(ticks):
+        return []
+    
+    # order labels in the direction the lines are laid out
+    order = np.argsort(tick_locations)[::direction]
+    labels = [f"{tick:.01f}" for tick in np.asarray(ticks)[order]]
+    tick_locations = np.asarray(tick_locations)[order]
+    
+    spacing = np.abs(np.diff(tick_locations))
+    evenly_spaced = len(spacing) and np.allclose(spacing, spacing[0]) and 0 < spacing[0] <= MAX_SPACE_LINE * size
+    groups = [(labels, tick_locations[0])] if evenly_spaced else zip(labels, tick_locations)
+    
+    objects = []
+    for group_labels, first_location in groups:
         
-    for tick, tick_location in zip(ticks, tick_locations):
+        text_data = bpy.data.curves.new(f"Ticks {'xyz'[axis]}", type='FONT')
+        text_data.body = "\n".join(group_labels) if evenly_spaced else group_labels
+        text_data.size = size
+        if evenly_spaced:
+            text_data.space_line = spacing[0] / size
+        text_data.align_x = align_x
+        text_data.align_y = 'TOP_BASELINE'
         
-        location = initial_location
-        location[axis] = tick_location
+        # center the capital letters of the first line on its tick
+        object_location = location.copy()
+        object_location[axis] = first_location + .35 * size * direction
         
-        bpy.ops.object.text_add(location=location, rotation=rotation, scale=(1, 1, 1))
-        text_data = bpy.context.object.data
-        text_data.body = f"{tick:.01f}"
-        text_data.size = size
-        if axis:
-            text_data.align_x = 'RIGHT'
-        text_data.align_y = 'CENTER'
\ No newline at end of file
+        object = bpy.data.objects.new(text_data.name, text_data)
+        object.location = object_location
+        object.rotation_euler = rotation
+        bpy.context.collection.objects.link(object)
+        objects.append(object)
+    
+    return objects
@@ -1,3 +1,4 @@
+from .statistics import Statistics
 import numpy as np
 
 class Bounds:
@@ -24,16 +25,10 @@ class Bounds:
     def update(self, bounds):
         
         # recalculate the bounding box
-        xmin = min(self.xmin, bounds.xmin)
-        xmax = max(self.xmax, bounds.xmax)
-        
-        ymin = min(self.ymin, bounds.ymin)
-        ymax = max(self.ymax, bounds.ymax)
-        
-        zmin = min(self.zmin, bounds.zmin)
-        zmax = max(self.zmax, bounds.zmax)
-        
-        self.set_bounds(bounds=[(xmin,xmax),(ymin,ymax),(zmin,zmax)])
+        self.set_bounds(bounds=np.column_stack((
+                                                    np.fmin(self.bounds[:,0], bounds.bounds[:,0]),
+                                                    np.fmax(self.bounds[:,1], bounds.bounds[:,1])
+                                                )))
 
         if hasattr(bounds, 'rescaled'):
 
@@ -45,19 +40,14 @@ class Bounds:
     @classmethod
     def _from_object(cls, obj):
 
-        xmin, xmax = obj.x.min(), obj.x.max()
-        ymin, ymax = obj.y.min(), obj.y.max()
-        zmin, zmax = obj.z.min(), obj.z.max()
-        bounds = cls([(xmin, xmax),(ymin, ymax),(zmin, zmax)])
-
-        return bounds
+        return cls._from_xyz(obj.x, obj.y, obj.z)
 
     @classmethod
     def _from_xyz(cls, x, y, z):
 
-        xmin, xmax = x.min(), x.max()
-        ymin, ymax = y.min(), y.max()
-        zmin, zmax = z.min(), z.max()
-        bounds = cls([(xmin, xmax),(ymin, ymax),(zmin, zmax)])
+        return cls._from_statistics(Statistics.from_xyz(x, y, z))
+
+    @classmethod
+    def _from_statistics(cls, statistics):
 
-        return bounds
+        return cls(statistics.bounds)
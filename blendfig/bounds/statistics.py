@@ -0,0 +1,83 @@
+import numpy as np
+
+class AxisStatistics:
+    """ Minimum, maximum, NaN count, size and dtype of the data along one axis """
+
+    def __init__(self, min=np.inf, max=-np.inf, nan_count=0, count=0, dtype=None):
+
+        self.min = min
+        self.max = max
+        self.nan_count = nan_count
+        self.count = count
+        self.dtype = dtype
+
+    @classmethod
+    def from_array(cls, values):
+
+        values = np.asarray(values)
+        if not values.size:
+            return cls(dtype=values.dtype)
+
+        # min propagates NaN, so the NaN-aware reductions are only needed if there are NaNs
+        min, max, nan_count = values.min(), values.max(), 0
+        if np.isnan(min):
+            nan_count = int(np.count_nonzero(np.isnan(values)))
+            min, max = np.fmin.reduce(values, axis=None), np.fmax.reduce(values, axis=None)
+
+        return cls(min, max, nan_count, values.size, values.dtype)
+
+    def merge(self, other):
+        """ Statistics of both data sets combined """
+
+        dtype = other.dtype if self.dtype is None else self.dtype if other.dtype is None else np.result_type(self.dtype, other.dtype)
+
+        return AxisStatistics(
+                    np.fmin(self.min, other.min), np.fmax(self.max, other.max),
+                    self.nan_count + other.nan_count, self.count + other.count, dtype
+                )
+
+    @property
+    def range(self):
+
+        return self.min, self.max
+
+class Statistics:
+    """ Cached statistics of the x, y and z data of a trace, computed once and updated incrementally when data is appended.
+        Bounds, rescaling and the figure bounds are derived from it without scanning the data again. """
+
+    def __init__(self, x=None, y=None, z=None):
+
+        self.x = x or AxisStatistics()
+        self.y = y or AxisStatistics()
+        self.z = z or AxisStatistics()
+
+    @classmethod
+    def from_xyz(cls, x, y, z):
+
+        return cls(AxisStatistics.from_array(x), AxisStatistics.from_array(y), AxisStatistics.from_array(z))
+
+    def append(self, x, y, z):
+        """ Include appended data """
+
+        self.x, self.y, self.z = [
+                                    axis.merge(AxisStatistics.from_array(values))
+                                    for axis, values in zip((self.x, self.y, self.z), (x, y, z))
+                                ]
+
+        return self
+
+    def merge(self, other):
+        """ Statistics of two traces combined """
+
+        return Statistics(self.x.merge(other.x), self.y.merge(other.y), self.z.merge(other.z))
+
+    @property
+    def bounds(self):
+        """ Array of (min, max) for each axis """
+
+        return np.array([self.x.range, self.y.range, self.z.range], dtype=float)
+
+    @property
+    def nan_count(self):
+
+        return self.x.nan_count + self.y.nan_count + self.z.nan_count
@@ -48,6 +48,43 @@ def add_box(x, y, z):
     bpy.ops.transform.resize(value=(1, yscale, zscale), mirror=False, use_proportional_edit=False)
     bpy.ops.object.transform_apply(scale=True)
     
+def mesh_from_arrays(name, vertices, edges=None, faces=None):
+    """ Create a mesh object from vertex, edge and face arrays in bulk and link it to the active collection.
+        - vertices is an (n, 3) array of coordinates.
+        - edges is an (m, 2) array of vertex indices.
+        - faces is an (k, s) array of vertex indices where all faces have the same number of sides s.
+    """
+    
+    vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+    
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set('co', vertices.ravel())
+    
+    if edges is not None and len(edges):
+        edges = np.asarray(edges, dtype=np.int32).reshape(-1, 2)
+        mesh.edges.add(len(edges))
+        mesh.edges.foreach_set('vertices', edges.ravel())
+    
+    if faces is not None and len(faces):
+        faces = np.asarray(faces, dtype=np.int32)
+        face_num, sides = faces.shape
+        mesh.loops.add(face_num * sides)
+        mesh.loops.foreach_set('vertex_index', faces.ravel())
+        mesh.polygons.add(face_num)
+        mesh.polygons.foreach_set('loop_start', np.arange(0, face_num * sides, sides, dtype=np.int32))
+        
+        # loop_total became read-only in Blender 4.0
+        if bpy.app.version < (4, 0, 0):
+            mesh.polygons.foreach_set('loop_total', np.full(face_num, sides, dtype=np.int32))
+    
+    mesh.update(calc_edges=faces is not None and len(faces) > 0)
+    
+    object = bpy.data.objects.new(name, mesh)
+    bpy.context.collection.objects.link(object)
+    
+    return object
+
 def add_text(text, name='Text', align_x='LEFT', align_y='CENTER', location=None):
     """ Add a text object or a list thereof given a string or list of strings. Optionally can add locations."""
     
@@ -87,25 +124,120 @@ def add_text(text, name='Text', align_x='LEFT', align_y='CENTER', location=None)
 
     
 
-def surface_from_grid(z):
-    """ Deform a flat grid (must be active) into a surface characterizad by z data. Data must match the vertex structure of the grid. """
+def surface_arrays(x, y, z):
+    """ Vertices and quad faces of the surface given by axis values x, y and a z array of shape (len(x), len(y)).
+        Cells with a NaN corner are left out and only vertices of the remaining faces are kept.
+        Also returns the index of each kept vertex in the full grid, ordered with x running fastest. """
     
-    data = bpy.context.object.data
+    x, y, z = np.asarray(x), np.asarray(y), np.asarray(z)
+    nx, ny = z.shape
     
-    xlen = len(z)
+    # vertices are ordered with x running fastest, matching the primitive grid
+    X, Y = np.meshgrid(x, y, indexing='ij')
+    vertices = np.column_stack((X.T.ravel(), Y.T.ravel(), z.T.ravel()))
     
-    for i, vert in enumerate(data.vertices):
-        
-        vert.co.z = z[i % xlen][int(i/xlen)]    
+    # one quad per grid cell
+    index = np.arange(nx * ny).reshape(ny, nx)[:-1, :-1].ravel()
+    faces = np.column_stack((index, index + 1, index + 1 + nx, index + nx))
+    
+    valid = np.isfinite(vertices[:, 2])
+    if valid.all():
+        return vertices, faces, np.arange(nx * ny)
+    
+    # keep complete cells and compact the vertices they use
+    faces = faces[valid[faces].all(axis=1)]
+    used = np.zeros(nx * ny, dtype=bool)
+    used[faces.ravel()] = True
+    vertex_index = np.flatnonzero(used)
+    new_index = np.cumsum(used) - 1
+    
+    return vertices[vertex_index], new_index[faces], vertex_index
 
-def surface_from_function(f, size):
+def surface_normals(x, y, z):
+    """ Unit vertex normals of the surface z(x, y) from finite differences, ordered like the vertices of surface_arrays.
+        Next to NaN values one-sided differences are used, vertices without finite neighbours get a normal pointing up. """
+    
+    # evenly spaced axes are passed as a scalar spacing, which is cheaper for np.gradient
+    spacing = []
+    for axis in (np.asarray(y, dtype=float), np.asarray(x, dtype=float)):
+        step = axis[1] - axis[0]
+        spacing.append(step if np.allclose(np.diff(axis), step) else axis)
+    
+    # differentiate the transposed view so the results are already in vertex order (x running fastest)
+    z = np.asarray(z, dtype=np.float32).T
+    dz_dy, dz_dx = np.gradient(z, *spacing)
+    _one_sided_differences(dz_dy, z, y, axis=0)
+    _one_sided_differences(dz_dx, z, x, axis=1)
+    
+    # n = (-dz/dx, -dz/dy, 1) / |n|, interleaved in a single write
+    inverse_norm = 1 / np.sqrt(dz_dx * dz_dx + dz_dy * dz_dy + 1)
+    dz_dx *= -inverse_norm
+    dz_dy *= -inverse_norm
+    normals = np.stack((dz_dx, dz_dy, inverse_norm), axis=-1).reshape(-1, 3)
+    normals[np.isnan(inverse_norm.ravel())] = (0, 0, 1)
+    
+    return normals
+
+def _one_sided_differences(gradient, z, axis_values, axis):
+    """ Replace central differences spoiled by a NaN neighbour with the forward or backward difference, in place """
+    
+    spoiled = np.isnan(gradient) & ~np.isnan(z)
+    if not spoiled.any():
+        return
+    
+    shape = [1, 1]
+    shape[axis] = -1
+    steps = np.diff(z, axis=axis) / np.diff(np.asarray(axis_values, dtype=np.float32)).reshape(shape)
+    
+    padding = [(0, 0), (0, 0)]
+    padding[axis] = (0, 1)
+    forward = np.pad(steps, padding, constant_values=np.nan)
+    padding[axis] = (1, 0)
+    backward = np.pad(steps, padding, constant_values=np.nan)
+    
+    gradient[spoiled] = np.where(np.isnan(forward), backward, forward)[spoiled]
+
+def set_smooth_normals(mesh, normals):
+    """ Shade all faces smooth and set custom vertex normals, both in bulk """
+    
+    mesh.polygons.foreach_set('use_smooth', np.ones(len(mesh.polygons), dtype=bool))
+    
+    # custom normals need auto smooth before Blender 4.1
+    if hasattr(mesh, 'use_auto_smooth'):
+        mesh.use_auto_smooth = True
+    mesh.normals_split_custom_set_from_vertices(np.asarray(normals, dtype=np.float32))
+
+def add_surface(x, y, z, name='Surface'):
+    """ Add a surface mesh built in bulk from axis values x, y and a z array of shape (len(x), len(y)).
+        Unlike add_grid the axis values need not be evenly spaced and NaN values leave holes. """
+    
+    vertices, faces, _ = surface_arrays(x, y, z)
+    
+    return mesh_from_arrays(name, vertices, faces=faces)
+
+def surface_from_grid(z):
+    """ Deform a flat grid (must be active) into a surface characterizad by z data. Data must match the vertex structure of the grid. """
     
     data = bpy.context.object.data
+    
+    co = np.empty(3 * len(data.vertices), dtype=np.float32)
+    data.vertices.foreach_get('co', co)
+    co[2::3] = np.asarray(z).T.ravel()
+    data.vertices.foreach_set('co', co)
+    data.update()
 
-    for vert in data.vertices:
-        
-        x, y, z = vert.co
-        vert.co.z = f(x+size/2, y)
+def surface_from_function(f, size=0, object=None):
+    """ Deform a flat grid into the surface z = f(x+size/2, y). f is called once on arrays of all vertex coordinates.
+        Uses the active object unless an object is given. """
+    
+    data = (object or bpy.context.object).data
+    
+    co = np.empty(3 * len(data.vertices), dtype=np.float32)
+    data.vertices.foreach_get('co', co)
+    x, y = co[0::3], co[1::3]
+    co[2::3] = np.broadcast_to(f(x + size/2, y), x.shape)
+    data.vertices.foreach_set('co', co)
+    data.update()
 
 def make_mesh_curve(x=None, y=None, bevel=0, material=None, epsilon=1.e-5):
     """ Duplicate a mesh line in a selected mesh as a sperate object. Give x or y coordinate of the mesh line. """
@@ -154,8 +286,13 @@ def make_mesh_curve(x=None, y=None, bevel=0, material=None, epsilon=1.e-5):
     plane.select_set(False)
     bpy.context.view_layer.objects.active = curve
     curve.name = f"Curve {coordinate}={value:.1f}"
+    mesh = curve.data
     bpy.ops.object.convert(target='CURVE')
     
+    # the separated mesh is left without users by the conversion
+    if mesh.users == 0:
+        bpy.data.meshes.remove(mesh)
+    
     # bevel and set material
     if bevel:
         curve.data.bevel_depth = bevel
@@ -163,4 +300,6 @@ def make_mesh_curve(x=None, y=None, bevel=0, material=None, epsilon=1.e-5):
         curve.data.materials.append(material)
     
     # select the original mesh
-    bpy.context.view_layer.objects.active = obj
\ No newline at end of file
+    bpy.context.view_layer.objects.active = obj
+    
+    return curve
\ No newline at end of file
@@ -0,0 +1,157 @@
+from collections import deque
+import asyncio
+import queue
+import threading
+import time
+
+class LiveMetrics:
+    """ Counters and latency statistics of a LiveUpdater """
+
+    def __init__(self, window=100):
+
+        self.ticks = 0
+        self.applied = 0
+        self.coalesced = 0 # updates superseded by a newer one for the same trace before being applied
+        self.dropped = 0 # updates rejected because the queue was full
+        self.failed = 0 # updates whose apply raised, the error of the last one is kept in last_error
+        self.last_error = None # (key, exception)
+        self.latencies = deque(maxlen=window) # seconds from push to apply of the last updates
+
+        self._lock = threading.Lock()
+
+    def _count_dropped(self):
+
+        with self._lock:
+            self.dropped += 1
+
+    @property
+    def latency(self):
+        """ Latency of the last applied update """
+
+        return self.latencies[-1] if self.latencies else None
+
+    @property
+    def mean_latency(self):
+
+        return sum(self.latencies) / len(self.latencies) if self.latencies else None
+
+    @property
+    def max_latency(self):
+
+        return max(self.latencies) if self.latencies else None
+
+    def as_dict(self):
+
+        return {
+                    'ticks': self.ticks, 'applied': self.applied, 'coalesced': self.coalesced, 'dropped': self.dropped,
+                    'failed': self.failed,
+                    'latency': self.latency, 'mean_latency': self.mean_latency, 'max_latency': self.max_latency,
+                }
+
+class LiveUpdater:
+    """ 
+    Apply data coming from other threads or coroutines to traces on Blender's main thread.
+    Producers push updates into a bounded thread-safe queue. A timer callback drains the queue, keeps only the latest
+    update of each trace and applies at most max_updates_per_tick of them, leaving the rest for the next tick.
+    tick() can also be called directly, e.g. to drive the updater from a fake feed without Blender's timers.
+    """
+
+    def __init__(self, traces=None, interval=.05, max_updates_per_tick=8, max_pending=256, apply=None, clock=time.perf_counter):
+
+        self.traces = dict(traces or {}) # key -> trace
+        self.interval = interval
+        self.max_updates_per_tick = max_updates_per_tick
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.pending = {} # key -> (data, push time), latest update per trace in order of arrival
+        self.apply = apply or (lambda trace, data: trace.update(**data))
+        self.clock = clock
+
+        self.metrics = LiveMetrics()
+        self.running = False
+        self._timer = self.tick # Blender's timers compare callbacks by identity and each self.tick is a new bound method
+
+    def add_trace(self, key, trace):
+
+        self.traces[key] = trace
+
+    def push(self, key, block=False, timeout=None, **data):
+        """ Queue new data for the trace with the given key. Safe to call from any thread.
+            If the queue is full the update is dropped unless block is set. Returns whether the update was queued. """
+
+        self._check_key(key)
+        try:
+            self.queue.put((key, data, self.clock()), block=block, timeout=timeout)
+        except queue.Full:
+            self.metrics._count_dropped()
+            return False
+
+        return True
+
+    async def consume(self, source):
+        """ Push (key, data) pairs from an async iterable, waiting instead of dropping while the queue is full """
+
+        async for key, data in source:
+            self._check_key(key)
+            while True:
+                try:
+                    self.queue.put_nowait((key, data, self.clock()))
+                    break
+                except queue.Full:
+                    await asyncio.sleep(self.interval)
+
+    def tick(self):
+        """ Drain the queue, coalesce per trace and apply a bounded batch. Returns the time until the next tick as Blender's timers expect. """
+
+        # coalesce everything which arrived since the last tick
+        while True:
+            try:
+                key, data, pushed = self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if key in self.pending:
+                self.metrics.coalesced += 1
+            self.pending[key] = (data, pushed)
+
+        # apply the oldest pending traces first
+        for key in list(self.pending)[:self.max_updates_per_tick]:
+
+            data, pushed = self.pending.pop(key)
+
+            # an exception escaping the timer callback would silently unregister it, so count the failure and go on
+            try:
+                self.apply(self.traces[key], data)
+            except Exception as error:
+                self.metrics.failed += 1
+                self.metrics.last_error = (key, error)
+                continue
+
+            self.metrics.applied += 1
+            self.metrics.latencies.append(self.clock() - pushed)
+
+        self.metrics.ticks += 1
+
+        return self.interval if self.running else None
+
+    def _check_key(self, key):
+
+        if key not in self.traces:
+            raise KeyError(f"No trace with key {key!r}, add it with add_trace first")
+
+    def start(self):
+        """ Start applying updates from a Blender timer """
+
+        import bpy
+
+        if not self.running:
+            self.running = True
+            bpy.app.timers.register(self._timer, first_interval=self.interval)
+
+    def stop(self):
+        """ Stop the timer. Pending updates are kept. """
+
+        import bpy
+
+        self.running = False
+        if bpy.app.timers.is_registered(self._timer):
+            bpy.app.timers.unregister(self._timer)
@@ -0,0 +1,84 @@
+import bpy
+
+# approximate bytes per element of the mesh arrays: vertex positions, edge and loop indices, face offsets
+MESH_ELEMENT_SIZES = {'vertices': 12, 'edges': 8, 'loops': 4, 'polygons': 4}
+ATTRIBUTE_SIZES = {'FLOAT': 4, 'INT': 4, 'FLOAT_VECTOR': 12, 'FLOAT_COLOR': 16, 'BYTE_COLOR': 4, 'FLOAT2': 8, 'BOOLEAN': 1, 'INT8': 1}
+
+class Registry:
+    """ Record of the datablocks (objects, meshes, curves, materials, collections) created for a figure or trace,
+        so that exactly these can be removed in one batch. """
+
+    def __init__(self):
+
+        self.datablocks = {} # keyed by pointer to avoid duplicates
+
+    def register(self, *datablocks):
+        """ Record datablocks. Objects also record their data. Returns the first datablock for convenience. """
+
+        for datablock in datablocks:
+
+            self.datablocks[datablock.as_pointer()] = datablock
+            if isinstance(datablock, bpy.types.Object) and datablock.data is not None:
+                self.datablocks[datablock.data.as_pointer()] = datablock.data
+
+        return datablocks[0] if datablocks else None
+
+    def absorb(self, other):
+        """ Move the records of another registry into this one """
+
+        self.datablocks.update(other.datablocks)
+        other.datablocks = {}
+
+    def clear(self):
+        """ Remove all recorded datablocks which still exist in a single batch.
+            Returns a report with the number of removed datablocks per type and the estimated memory reclaimed in bytes. """
+
+        alive = [datablock for datablock in self.datablocks.values() if _exists(datablock)]
+
+        report = {'bytes': 0}
+        for datablock in alive:
+            type_name = type(datablock).__name__
+            report[type_name] = report.get(type_name, 0) + 1
+            report['bytes'] += estimate_size(datablock)
+
+        bpy.data.batch_remove(ids=alive)
+        self.datablocks = {}
+
+        return report
+
+    def __len__(self):
+
+        return len(self.datablocks)
+
+def _exists(datablock):
+    """ Whether a datablock has not been removed in the meantime (e.g. by the user) """
+
+    try:
+        datablock.name
+    except ReferenceError:
+        return False
+
+    return True
+
+def estimate_size(datablock):
+    """ Rough estimate of the memory taken by the geometry of a datablock in bytes """
+
+    if isinstance(datablock, bpy.types.Mesh):
+
+        size = sum(len(getattr(datablock, elements)) * element_size for elements, element_size in MESH_ELEMENT_SIZES.items())
+
+        # custom attributes, internal and built-in ones are already covered above
+        for attribute in datablock.attributes:
+            if attribute.name.startswith('.') or attribute.name == 'position':
+                continue
+            size += len(attribute.data) * ATTRIBUTE_SIZES.get(attribute.data_type, 4)
+
+        return size
+
+    if isinstance(datablock, bpy.types.TextCurve):
+        return len(datablock.body) * 64
+
+    if isinstance(datablock, bpy.types.Curve):
+        return sum(12 * (len(spline.points) + len(spline.bezier_points)) for spline in datablock.splines)
+
+    return 0
@@ -1,19 +1,37 @@
 import numpy as np
 
-def map_array(input_array, output_range):
-    """ Map an array of values to a desired range """
+def map_array(input_array, output_range, input_range=None):
+    """ Map an array of values to a desired range. The input range is computed from the array unless given. """
     
     # numpify
     if not isinstance(input_array, np.ndarray): 
         input_array = np.array(input_array)
         
     # get ranges
-    input_min, input_max = np.min(input_array), np.max(input_array)
+    input_min, input_max = input_range if input_range is not None else (np.nanmin(input_array), np.nanmax(input_array))
     output_min, output_max = output_range
     
+    # constant data maps to the start of the output range
+    if input_max == input_min:
+        return np.where(np.isnan(input_array), np.nan, output_min)
+    
     return (output_max - output_min) * (input_array - input_min)/(input_max - input_min) + output_min
 
-def resize_array(input_array, output_size=10):
+def resize_range(input_range, output_size=10):
+    """ The range resize_array maps an array with the given input range to """
+    
+    input_min, input_max = input_range
+    input_size = input_max - input_min
+    
+    if input_size == 0:
+        return 0, 0
+    
+    if 0 >= input_min and 0 <= input_max:
+        return input_min/input_size*output_size, input_max/input_size*output_size
+    
+    return 0, output_size
+
+def resize_array(input_array, output_size=10, input_range=None):
     """ 
     Rescale an array to be within a set size (range). If origin within the range of array,
     preserve sign relationships. Otherwise map to (0,size)
@@ -23,29 +41,164 @@ def resize_array(input_array, output_size=10):
     if not isinstance(input_array, np.ndarray):
         input_array = np.array(input_array)
 
-    input_min, input_max = input_array.min(), input_array.max()
-    input_size = input_max - input_min
+    if input_range is None:
+        input_range = np.nanmin(input_array), np.nanmax(input_array)
 
-    if 0 >= input_min and 0 <= input_max:
+    return map_array(input_array, resize_range(input_range, output_size), input_range=input_range)
 
-        output_min = input_min/input_size*output_size
-        output_max = input_max/input_size*output_size
-        return map_array(input_array, (output_min, output_max))
+def rescaled_sizes(bounds, scale=10):
+    """ Output size of each axis when rescaling data with the given (min, max) bounds per axis.
+        x spans scale, or the widest axis does if x is constant. """
+    
+    ranges = np.asarray(bounds, dtype=float) @ np.array([-1, 1])
+    reference = ranges[0] if ranges[0] else ranges.max()
+    
+    return scale * ranges / reference if reference else np.zeros_like(ranges)
 
-    else:
-        return map_array(input_array, (0, output_size))
+def rescaled_bounds(bounds, scale=10):
+    """ Bounds of the output of rescale_xyz for data with the given bounds, without touching the data """
+    
+    return np.array([resize_range(axis_bounds, size) for axis_bounds, size in zip(bounds, rescaled_sizes(bounds, scale))])
 
-def rescale_xyz(x,y,z, scale=10):
+def rescale_xyz(x,y,z, scale=10, bounds=None):
+    """ Rescale x, y, z preserving aspect ratios so that x (or the widest axis if x is constant) spans scale. Pass precomputed bounds to avoid scanning the data. """
     
     # numpify
     x, y, z = [np.array(input_array) if (not isinstance(input_array, np.ndarray)) else input_array for input_array in [x,y,z]]
     
-    xrange = x.max()-x.min()
-    yrange = y.max()-y.min()
-    zrange = z.max()-z.min()
+    if bounds is None:
+        bounds = [(np.nanmin(input_array), np.nanmax(input_array)) for input_array in (x, y, z)]
+
+    return tuple(
+                resize_array(input_array, output_size=size, input_range=axis_bounds)
+                for input_array, axis_bounds, size in zip((x, y, z), bounds, rescaled_sizes(bounds, scale))
+            )
+
+def nan_filled(input_array):
+    """ Convert to a float array with masked entries (of a numpy masked array) replaced by NaN """
+    
+    return np.ma.filled(np.ma.asarray(input_array, dtype=float), np.nan)
+
+def evaluate_on_grid(f, x, y):
+    """ Evaluate f(x, y) once on the full grid spanned by the axis values x and y """
+    
+    X, Y = np.meshgrid(x, y, indexing='ij')
+    
+    return np.broadcast_to(np.asarray(f(X, Y), dtype=float), X.shape)
+
+def sample_function(f, x, y, samples=51, tolerance=None, max_refinements=6):
+    """ 
+    Sample z = f(x, y) on a grid. f must accept arrays (NumPy ufunc style).
+    - x, y are tuples of the minimum and maximum in each direction.
+    - samples is the initial number of points per axis, int or tuple (x_samples, y_samples).
+    - if tolerance is given, grid lines are inserted at interval midpoints wherever the bilinear
+      interpolation misses f by more than tolerance, up to max_refinements times.
+    Returns the (generally unevenly spaced) axis values and the z array.
+    """
+    
+    x_samples, y_samples = (samples, samples) if np.ndim(samples) == 0 else samples
+    x = np.linspace(*x, int(x_samples))
+    y = np.linspace(*y, int(y_samples))
+    z = evaluate_on_grid(f, x, y)
+    
+    if tolerance is None:
+        return x, y, z
+    
+    # intervals which passed the test are only tested again along lines inserted since (the fresh lines)
+    x_converged = np.zeros(len(x) - 1, dtype=bool)
+    y_converged = np.zeros(len(y) - 1, dtype=bool)
+    x_fresh = np.zeros(len(x), dtype=bool)
+    y_fresh = np.zeros(len(y), dtype=bool)
+    
+    for _ in range(max_refinements):
+        
+        # reopen converged intervals which fail along the fresh lines
+        x_closed, y_closed = np.flatnonzero(x_converged), np.flatnonzero(y_converged)
+        z_x_closed = evaluate_on_grid(f, .5 * (x[x_closed] + x[x_closed + 1]), y[y_fresh])
+        z_y_closed = evaluate_on_grid(f, x[x_fresh], .5 * (y[y_closed] + y[y_closed + 1]))
+        z_fresh_y, z_fresh_x = z[:, y_fresh], z[x_fresh]
+        x_converged[x_closed] = np.abs(z_x_closed - .5 * (z_fresh_y[x_closed] + z_fresh_y[x_closed + 1])).max(axis=1, initial=0) <= tolerance
+        y_converged[y_closed] = np.abs(z_y_closed - .5 * (z_fresh_x[:, y_closed] + z_fresh_x[:, y_closed + 1])).max(axis=0, initial=0) <= tolerance
+        
+        # compare f at the midpoints of the open intervals with the interpolation between grid lines
+        x_open, y_open = np.flatnonzero(~x_converged), np.flatnonzero(~y_converged)
+        x_mid = .5 * (x[x_open] + x[x_open + 1])
+        y_mid = .5 * (y[y_open] + y[y_open + 1])
+        z_x_mid = evaluate_on_grid(f, x_mid, y)
+        z_y_mid = evaluate_on_grid(f, x, y_mid)
+        refine_x = np.abs(z_x_mid - .5 * (z[x_open] + z[x_open + 1])).max(axis=1, initial=0) > tolerance
+        refine_y = np.abs(z_y_mid - .5 * (z[:, y_open] + z[:, y_open + 1])).max(axis=0, initial=0) > tolerance
+        
+        x_converged[x_open[~refine_x]] = True
+        y_converged[y_open[~refine_y]] = True
+        if not (refine_x.any() or refine_y.any()):
+            break
+        
+        # insert the new grid lines reusing the midpoint values, only their crossings are new evaluations
+        x_split, y_split = x_open[refine_x] + 1, y_open[refine_y] + 1
+        x_new, y_new = x_mid[refine_x], y_mid[refine_y]
+        z = np.insert(z, x_split, z_x_mid[refine_x], axis=0)
+        y_columns = np.insert(z_y_mid[:, refine_y], x_split, evaluate_on_grid(f, x_new, y_new), axis=0)
+        z = np.insert(z, y_split, y_columns, axis=1)
+        x = np.insert(x, x_split, x_new)
+        y = np.insert(y, y_split, y_new)
+        
+        # both halves of a refined interval are open
+        x_converged = np.insert(x_converged, x_split, False)
+        y_converged = np.insert(y_converged, y_split, False)
+        x_fresh = np.insert(np.zeros(len(x_fresh), dtype=bool), x_split, True)
+        y_fresh = np.insert(np.zeros(len(y_fresh), dtype=bool), y_split, True)
+    
+    return x, y, z
 
-    xr = resize_array(x, output_size=scale)
-    yr = resize_array(y, output_size=scale*yrange/xrange)
-    zr = resize_array(z, output_size=scale*zrange/xrange)
+def get_column(data, name):
+    """ Get a column of a pandas DataFrame, pyarrow Table or dict of arrays as an array without copying where possible """
+    
+    column = data[name]
+    
+    # pandas categoricals are represented by their integer codes
+    if hasattr(column, 'cat'):
+        return column.cat.codes.to_numpy()
+    
+    if hasattr(column, 'to_numpy'):
+        try:
+            return column.to_numpy(copy=False) # pandas
+        except TypeError:
+            return column.to_numpy() # pyarrow, zero-copy for single chunks without nulls
+    
+    return np.asarray(column)
+
+def numeric_array(values):
+    """ Convert input data to an array. Numbers of any precision are kept, other data (e.g. strings) is replaced by its index. """
+    
+    if hasattr(values, 'cat'):
+        values = values.cat.codes
+    
+    array = np.asarray(values)
+    if np.issubdtype(array.dtype, np.bool_):
+        return array.astype(int)
+    if np.issubdtype(array.dtype, np.number):
+        return array
+    
+    return np.arange(0, array.shape[0])
+
+def group_indices(keys):
+    """ 
+    Split rows into groups of equal keys with a single stable argsort.
+    Returns the group keys, the permutation sorting the rows by group and the start of each group in the sorted order
+    (with the total length appended) so that group i is order[starts[i]:starts[i+1]].
+    """
+    
+    keys = np.asarray(keys)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    changes = sorted_keys[1:] != sorted_keys[:-1]
+    
+    # NaN (or NaT) keys are sorted last and form a single group
+    if keys.dtype.kind in 'fcmM':
+        missing = sorted_keys != sorted_keys
+        changes &= ~(missing[1:] & missing[:-1])
+    
+    starts = np.concatenate(([0], np.flatnonzero(changes) + 1, [len(keys)]))
     
-    return xr, yr, zr
\ No newline at end of file
+    return sorted_keys[starts[:-1]], order, starts
@@ -0,0 +1,193 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# corners of a unit cube, corner index = dx + 2*dy + 4*dz
+CUBE_CORNERS = np.array([(dx, dy, dz) for dz in (0, 1) for dy in (0, 1) for dx in (0, 1)])
+
+# split of the cube into six tetrahedra around the main diagonal 0-7. Opposite faces of neighbouring
+# cubes are split along the same diagonal so the extracted surface is closed across cubes.
+CUBE_TETRAHEDRA = np.array([(0, 1, 3, 7), (0, 1, 5, 7), (0, 2, 3, 7), (0, 2, 6, 7), (0, 4, 5, 7), (0, 4, 6, 7)])
+
+TETRAHEDRON_EDGES = np.array([(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)])
+
+def _tetrahedron_table():
+    """ Triangles (as triples of tetrahedron edges) for each of the 16 inside/outside cases. -1 marks no triangle. """
+
+    edge_index = {tuple(edge): i for i, edge in enumerate(TETRAHEDRON_EDGES.tolist())}
+    edge = lambda a, b: edge_index[(min(a, b), max(a, b))]
+
+    table = -np.ones((16, 2, 3), dtype=np.int64)
+    for case in range(16):
+
+        inside = [v for v in range(4) if case >> v & 1]
+        outside = [v for v in range(4) if not case >> v & 1]
+
+        # a single vertex separated from the other three
+        if len(inside) in (1, 3):
+            lone = inside if len(inside) == 1 else outside
+            others = outside if len(inside) == 1 else inside
+            table[case, 0] = [edge(lone[0], v) for v in others]
+
+        # two against two, the crossed edges form a quad
+        elif len(inside) == 2:
+            (a, b), (c, d) = inside, outside
+            quad = [edge(a, c), edge(a, d), edge(b, d), edge(b, c)]
+            table[case, 0] = quad[0], quad[1], quad[2]
+            table[case, 1] = quad[0], quad[2], quad[3]
+
+    return table
+
+TETRAHEDRON_TRIANGLES = _tetrahedron_table()
+
+def isosurface(values, level, chunk_size=32, workers=1):
+    """ Extract the level set values == level of a 3D array with marching tetrahedra.
+        Returns vertices in index coordinates and triangular faces. Vertices on shared grid edges are welded.
+        - the volume is processed in slabs of chunk_size cells along the first axis.
+        - workers > 1 processes the slabs in parallel threads.
+    """
+
+    values = np.ascontiguousarray(values, dtype=float)
+    if values.ndim != 3:
+        raise ValueError("Values must be a 3D array")
+    if min(values.shape) < 2:
+        raise ValueError("Values must have at least 2 points along each axis")
+
+    starts = range(0, values.shape[0] - 1, chunk_size)
+    extract = lambda start: _isosurface_chunk(values, level, start, min(start + chunk_size, values.shape[0] - 1))
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(extract, starts))
+    else:
+        chunks = [extract(start) for start in starts]
+
+    keys = np.concatenate([chunk[0] for chunk in chunks])
+    positions = np.concatenate([chunk[1] for chunk in chunks])
+
+    # weld vertices which lie on the same grid edge
+    _, index, inverse = np.unique(keys.ravel(), return_index=True, return_inverse=True)
+    vertices = positions.reshape(-1, 3)[index]
+    faces = inverse.reshape(-1, 3)
+
+    return vertices, faces
+
+def _isosurface_chunk(values, level, start, stop):
+    """ Triangles of the cells start <= i < stop. Returns the grid edge key and the position of each triangle corner. """
+
+    nx, ny, nz = values.shape
+    slab = values[start:stop + 1]
+
+    # only cells which the level set passes through produce triangles
+    corners = [slab[dx:dx + stop - start, dy:dy + ny - 1, dz:dz + nz - 1] for dx, dy, dz in CUBE_CORNERS]
+    cell_min = np.minimum.reduce(corners)
+    cell_max = np.maximum.reduce(corners)
+    i, j, k = np.nonzero((cell_min <= level) & (cell_max > level))
+
+    if not len(i):
+        return np.empty((0, 3), dtype=np.int64), np.empty((0, 3, 3))
+
+    # flat indices of the tetrahedra vertices
+    strides = np.array([ny * nz, nz, 1])
+    cell_index = ((i + start) * ny + j) * nz + k
+    corner_index = cell_index[:, None] + CUBE_CORNERS @ strides
+    tetrahedra = corner_index[:, CUBE_TETRAHEDRA].reshape(-1, 4)
+    flat_values = values.reshape(-1)
+    inside = flat_values[tetrahedra] > level
+
+    # look up the triangles of each tetrahedron
+    case = inside @ np.array([1, 2, 4, 8])
+    triangles = TETRAHEDRON_TRIANGLES[case]
+    tetrahedron, slot = np.nonzero(triangles[:, :, 0] >= 0)
+    edges = TETRAHEDRON_EDGES[triangles[tetrahedron, slot]]
+
+    # interpolate along the crossed edges
+    a = tetrahedra[tetrahedron[:, None], edges[..., 0]]
+    b = tetrahedra[tetrahedron[:, None], edges[..., 1]]
+    value_a, value_b = flat_values[a], flat_values[b]
+    t = (level - value_a) / (value_b - value_a)
+    point_a = np.stack(np.unravel_index(a, values.shape), axis=-1)
+    point_b = np.stack(np.unravel_index(b, values.shape), axis=-1)
+    positions = point_a + t[..., None] * (point_b - point_a)
+
+    # orient normals towards decreasing values
+    normals = np.cross(positions[:, 1] - positions[:, 0], positions[:, 2] - positions[:, 0])
+    outward = (point_b[:, 0] - point_a[:, 0]) * np.where(value_a[:, 0] > level, 1, -1)[:, None]
+    flip = np.einsum('ij,ij->i', normals, outward) < 0
+    a[flip] = a[flip][:, ::-1]
+    b[flip] = b[flip][:, ::-1]
+    positions[flip] = positions[flip][:, ::-1]
+
+    keys = np.minimum(a, b) * values.size + np.maximum(a, b)
+
+    return keys, positions
+
+# cell edges as (start corner, end corner) offsets: bottom, right, top, left
+SQUARE_EDGES = np.array([((0, 0), (1, 0)), ((1, 0), (1, 1)), ((0, 1), (1, 1)), ((0, 0), (0, 1))])
+
+# segments (as pairs of cell edges) for each case, corner bits 00, 10, 11, 01. -1 marks no segment.
+# Cases 5 and 10 are saddles whose resolution depends on the cell center, their alternatives are stored as 16 and 17.
+SQUARE_SEGMENTS = -np.ones((18, 2, 2), dtype=np.int64)
+for case, segments in {
+                        1: [(3, 0)], 2: [(0, 1)], 3: [(3, 1)], 4: [(1, 2)], 5: [(3, 0), (1, 2)], 6: [(0, 2)], 7: [(2, 3)],
+                        8: [(2, 3)], 9: [(0, 2)], 10: [(3, 0), (1, 2)], 11: [(1, 2)], 12: [(1, 3)], 13: [(0, 1)], 14: [(3, 0)],
+                        16: [(0, 1), (2, 3)], 17: [(0, 1), (2, 3)],
+                    }.items():
+    SQUARE_SEGMENTS[case, :len(segments)] = segments
+
+def contour_lines(values, levels):
+    """ Contour lines of a 2D array with marching squares, all levels computed in one call.
+        Returns vertices as (i, j, level) with i, j in index coordinates, edges between vertices and the level of each edge.
+        Vertices on shared grid edges are welded so each contour is a connected line. """
+
+    values = np.asarray(values, dtype=float)
+    levels = np.atleast_1d(np.asarray(levels, dtype=float))
+    nx, ny = values.shape
+    size = values.size
+
+    if not levels.size:
+        return np.empty((0, 3)), np.empty((0, 2), dtype=np.int64), np.empty(0)
+
+    corners = values[:-1, :-1], values[1:, :-1], values[1:, 1:], values[:-1, 1:]
+    cell_min = np.minimum.reduce(corners)
+    cell_max = np.maximum.reduce(corners)
+    flat_values = values.ravel()
+
+    keys, positions, edge_levels = [], [], []
+    for level_index, level in enumerate(levels):
+
+        # only cells which the level passes through produce segments
+        i, j = np.nonzero((cell_min <= level) & (cell_max > level))
+        cell_corners = np.stack([corner[i, j] for corner in corners], axis=-1)
+        inside = cell_corners > level
+        case = inside @ np.array([1, 2, 4, 8])
+
+        # resolve saddles with the value at the cell center
+        center_inside = cell_corners.mean(axis=1) > level
+        case[(case == 5) & center_inside] = 16
+        case[(case == 10) & ~center_inside] = 17
+
+        segments = SQUARE_SEGMENTS[case]
+        cell, slot = np.nonzero(segments[:, :, 0] >= 0)
+        edges = segments[cell, slot]
+
+        # interpolate along the crossed cell edges
+        point_a = np.stack((i[cell], j[cell]), axis=-1)[:, None] + SQUARE_EDGES[edges, 0]
+        point_b = np.stack((i[cell], j[cell]), axis=-1)[:, None] + SQUARE_EDGES[edges, 1]
+        a = point_a[..., 0] * ny + point_a[..., 1]
+        b = point_b[..., 0] * ny + point_b[..., 1]
+        t = (level - flat_values[a]) / (flat_values[b] - flat_values[a])
+
+        keys.append((level_index * size + np.minimum(a, b)) * size + np.maximum(a, b))
+        positions.append(point_a + t[..., None] * (point_b - point_a))
+        edge_levels.append(np.full(len(cell), level))
+
+    keys = np.concatenate(keys)
+    positions = np.concatenate(positions)
+    edge_levels = np.concatenate(edge_levels)
+
+    # weld vertices which lie on the same grid edge
+    _, index, inverse = np.unique(keys.ravel(), return_index=True, return_inverse=True)
+    edges = inverse.reshape(-1, 2)
+    vertices = np.column_stack((positions.reshape(-1, 2)[index], np.repeat(edge_levels, 2)[index]))
+
+    return vertices, edges, edge_levels
@@ -18,6 +18,7 @@ class Bar(Scatter):
         bar_object = scatter_object.copy()
         bar_object.data = scatter_object.data.copy()
         bpy.context.collection.objects.link(bar_object)     
+        self.registry.register(bar_object)
         
         # add geometry nodes
         geonodes = bar_object.modifiers.new('Bars' + ' ' + self.name, type='NODES')
@@ -0,0 +1,106 @@
+from .trace import Trace
+from ..geometry.geometry import mesh_from_arrays
+from ..materials.colors import color_cycle
+from ..tools.functions import rescale_xyz
+from ..tools.marching import isosurface
+import numpy as np
+import bpy
+
+class Isosurface(Trace):
+    """ Object for drawing level sets of 3D scalar fields """
+
+    unnamed_isosurface_count = 0 # count how many unnamed isosurfaces have been created for consistent automatic naming
+
+    def __init__(
+                    self, x=None, y=None, z=None, value=None, level=None, name="Isosurface", color=None,
+                    chunk_size=32, workers=1
+                ):
+
+        super().__init__()
+
+        # save input data
+        self.value = np.asarray(value, dtype=float)
+        self.x = np.array(x)
+        self.y = np.array(y)
+        self.z = np.array(z)
+
+        # check and process input
+        self._check_input()
+
+        # level defaults to the middle of the value range
+        if level is None:
+            level = .5 * (np.nanmin(self.value) + np.nanmax(self.value))
+        self.level = level
+
+        self._set_statistics(self.x, self.y, self.z)
+
+        # name
+        if name == "Isosurface":
+            Isosurface.unnamed_isosurface_count += 1
+            name += ' ' + str(Isosurface.unnamed_isosurface_count)
+        self.name = name
+
+        # set color to user input or cycle through
+        if color:
+            self.color = color
+        else:
+            self.color = next(color_cycle)
+
+        # extraction parameters
+        self.chunk_size = chunk_size
+        self.workers = workers
+
+    def draw(self, rescale=True):
+
+        if rescale:
+            x, y, z = rescale_xyz(self.x, self.y, self.z, bounds=self.statistics.bounds)
+            self._set_rescaled_bounds()
+        else:
+            x, y, z = self.x, self.y, self.z
+
+        # extract in index coordinates and map onto the axes
+        vertices, faces = isosurface(self.value, self.level, chunk_size=self.chunk_size, workers=self.workers)
+        for axis, axis_values in enumerate((x, y, z)):
+            vertices[:, axis] = np.interp(vertices[:, axis], np.arange(len(axis_values)), axis_values)
+
+        object = mesh_from_arrays(self.name, vertices, faces=faces)
+
+        # create and assign material
+        material = bpy.data.materials.new(self.name)
+        material.diffuse_color = self.color
+        object.data.materials.append(material)
+        self.registry.register(object, material)
+
+        self.mesh_object = object
+
+        return object
+
+    def _check_input(self):
+        """ Determine input type and check for validity """
+
+        if self.value.ndim != 3:
+            raise ValueError("value should be a 3D array")
+
+        # if input is of mgrid form save only the axis values, if missing replace with integer ranges
+        for axis, name in enumerate('xyz'):
+
+            axis_values = getattr(self, name)
+            if axis_values.ndim == 3:
+                axis_values = axis_values[tuple(slice(None) if i == axis else 0 for i in range(3))]
+            elif axis_values.ndim == 0:
+                axis_values = np.arange(self.value.shape[axis])
+            elif axis_values.ndim != 1:
+                raise ValueError(f"{name} should have dimension 1 for list/array or 3 for numpy's mgrid.")
+
+            if len(axis_values) != self.value.shape[axis]:
+                raise ValueError(f"Length of {name} does not match the shape of value")
+
+            # rescaling assumes increasing axes, so flip decreasing ones together with the values
+            steps = np.diff(axis_values)
+            if (steps < 0).all():
+                axis_values = axis_values[::-1]
+                self.value = np.flip(self.value, axis=axis)
+            elif not (steps > 0).all():
+                raise ValueError(f"{name} should be strictly increasing or decreasing")
+
+            setattr(self, name, axis_values)
@@ -0,0 +1,129 @@
+from .trace import Trace
+from ..geometry.geometry import mesh_from_arrays
+from ..materials.colors import COLORS
+import numpy as np
+import bpy
+
+class MergedScatter(Trace):
+    """ Several Scatter traces drawn as a single object. Each point carries a trace_id attribute
+        which drives its color and lets individual traces be hidden or isolated without extra objects. """
+
+    def __init__(self, traces, name="Merged Scatter"):
+
+        super().__init__()
+        self.traces = list(traces)
+        self.name = name
+        self._set_counts()
+
+        # updates of the traces are written to the merged object
+        for trace in self.traces:
+            trace.merged = self
+
+        self.mesh_object = None
+
+    def draw(self, rescale=True):
+
+        self.rescale = rescale # reused by update_trace
+        # stack the points of all traces and label each point with its trace index
+        points = np.concatenate([np.column_stack(trace._get_xyz(rescale=rescale)) for trace in self.traces])
+        trace_id = np.repeat(np.arange(len(self.traces), dtype=np.int32), self.counts)
+
+        # connect consecutive points belonging to the same trace
+        start = np.flatnonzero(trace_id[:-1] == trace_id[1:])
+        edges = np.column_stack((start, start + 1))
+
+        object = mesh_from_arrays(self.name, points, edges=edges)
+        mesh = object.data
+
+        # per-point trace index and color
+        mesh.attributes.new('trace_id', 'INT', 'POINT').data.foreach_set('value', trace_id)
+        trace_colors = [trace.color or COLORS[i % len(COLORS)] for i, trace in enumerate(self.traces)]
+        colors = np.array(trace_colors, dtype=np.float32)[trace_id]
+        color_attribute = mesh.attributes.new('trace_color', 'FLOAT_COLOR', 'POINT')
+        color_attribute.data.foreach_set('color', colors.ravel())
+        mesh.attributes.active_color = color_attribute
+
+        # material reading the color attribute
+        material = bpy.data.materials.new(self.name)
+        material.use_nodes = True
+        nodes = material.node_tree.nodes
+        attribute_node = nodes.new('ShaderNodeAttribute')
+        attribute_node.attribute_name = 'trace_color'
+        material.node_tree.links.new(attribute_node.outputs['Color'], nodes['Principled BSDF'].inputs['Base Color'])
+        mesh.materials.append(material)
+        self.registry.register(object, material)
+
+        # visibility is controlled by a vertex group read by a mask modifier
+        group = object.vertex_groups.new(name='Visible')
+        group.add(range(len(points)), 1., 'REPLACE')
+        mask = object.modifiers.new('Visible', type='MASK')
+        mask.vertex_group = group.name
+
+        self.mesh_object = object
+
+        return object
+
+    def update_trace(self, trace):
+        """ Write the current data of a trace to the merged object. If the number of points of the trace changed
+            the merged object is redrawn, which shows all traces again. """
+
+        if self.mesh_object is None:
+            return None
+
+        index = self.traces.index(trace)
+        if trace.point_num != self.counts[index]:
+            self.clear()
+            self._set_counts()
+            return self.draw(rescale=self.rescale)
+
+        mesh = self.mesh_object.data
+        co = np.empty(3 * len(mesh.vertices), dtype=np.float32)
+        mesh.vertices.foreach_get('co', co)
+        start = self.offsets[index]
+        co.reshape(-1, 3)[start:start + self.counts[index]] = np.column_stack(trace._get_xyz(rescale=self.rescale))
+        mesh.vertices.foreach_set('co', co)
+        mesh.update()
+
+        return self.mesh_object
+
+    def hide_trace(self, trace):
+        """ Hide a trace given its index or the trace itself """
+
+        self._visibility_group().remove(self._vertex_indices(trace))
+
+    def show_trace(self, trace):
+        """ Show a trace given its index or the trace itself """
+
+        self._visibility_group().add(self._vertex_indices(trace), 1., 'REPLACE')
+
+    def isolate_trace(self, trace):
+        """ Show only the given trace """
+
+        group = self._visibility_group()
+        group.remove(range(self.counts.sum()))
+        group.add(self._vertex_indices(trace), 1., 'REPLACE')
+
+    def show_all(self):
+        """ Show all traces """
+
+        self._visibility_group().add(range(self.counts.sum()), 1., 'REPLACE')
+
+    def _set_counts(self):
+        """ Contiguous vertex range of each trace in the merged mesh """
+
+        self.counts = np.array([trace.point_num for trace in self.traces], dtype=np.int64)
+        self.offsets = np.concatenate(([0], np.cumsum(self.counts)[:-1])).astype(np.int64)
+
+    def _visibility_group(self):
+
+        if self.mesh_object is None:
+            raise RuntimeError("Merged traces have not been drawn yet")
+
+        return self.mesh_object.vertex_groups['Visible']
+
+    def _vertex_indices(self, trace):
+
+        index = trace if isinstance(trace, (int, np.integer)) else self.traces.index(trace)
+        start = int(self.offsets[index])
+
+        return range(start, start + int(self.counts[index]))
@@ -1,19 +1,19 @@
 from .trace import Trace
 from ..geometry.geometry import add_text
 from ..nodes.nodes import append_nodetree
-from ..tools.functions import rescale_xyz
-from ..bounds.bounds import Bounds
+from ..tools.functions import rescale_xyz, numeric_array
 import numpy as np
 import bpy
 
 class Scatter(Trace):
     """ Object for scatter and line plots """
     
-    def __init__(self, x=None, y=None, z=None, name="Scatter"):
+    def __init__(self, x=None, y=None, z=None, name="Scatter", color=None):
         
-        super().__init__()
+        super().__init__(color=color)
         self.name = name
         self.active_axes = [] # non-zero axes 
+        self.merged = None # MergedScatter drawing this trace, set when merged
         
         self.x, self.y, self.z, self.point_num = 0, 0, 0, 0
         if not x is None:
@@ -34,12 +34,15 @@ class Scatter(Trace):
             if self.active_axes:
                 if len(z) != self.point_num:
                     raise ValueError(f"Length of z and {self.active_axes[0]} do not match")             
+            else:
+                self.point_num = len(z)
             self.active_axes.append("z")
 
-        self.bounds = Bounds._from_object(self)
+        self._set_statistics(*self._get_xyz(rescale=False))
     
     def draw(self, rescale=True):
         
+        self.rescale = rescale # reused by update and extend
         mesh = bpy.data.meshes.new(self.name)
         mesh.vertices.add(self.point_num)
         mesh.edges.add(self.point_num-1)
@@ -56,6 +59,7 @@ class Scatter(Trace):
         object = bpy.data.objects.new(self.name, mesh)
         #c = bpy.data.collections.get('Collection')
         bpy.context.collection.objects.link(object)
+        self.registry.register(object)
         bpy.context.view_layer.objects.active = object
         bpy.ops.object.editmode_toggle()
         bpy.ops.object.editmode_toggle()
@@ -64,45 +68,83 @@ class Scatter(Trace):
         
         return object
 
-    def _get_xyz(self, rescale=True):
+    def update(self, x=None, y=None, z=None, rescale=None):
+        """ Replace the data of the trace. If it has been drawn the vertex positions are rewritten in bulk,
+            or the trace is redrawn if the number of points changed. rescale defaults to the value the trace was drawn with.
+            A trace drawn as part of a MergedScatter is updated in the merged object. """
+        
+        for name, values in (('x', x), ('y', y), ('z', z)):
+            if values is not None:
+                setattr(self, name, values)
+        
+        point_num = max(len(values) for values in (self.x, self.y, self.z) if not isinstance(values, int))
+        redraw = point_num != self.point_num
+        self.point_num = point_num
+        
+        self._set_statistics(*self._get_xyz(rescale=False))
+        
+        if getattr(self, 'mesh_object', None) is None:
+            return self.merged.update_trace(self) if self.merged is not None else None
+        
+        if rescale is None:
+            rescale = self.rescale
+        
+        if redraw:
+            self.clear()
+            return self.draw(rescale=rescale)
+        
+        mesh = self.mesh_object.data
+        mesh.vertices.foreach_set('co', np.column_stack(self._get_xyz(rescale=rescale)).astype(np.float32).ravel())
+        mesh.update()
+        
+        return self.mesh_object
 
-        if not isinstance(self.x, int):
-            
-            # convert to array in case is dataframe
-            x = np.array(self.x)
-            
-            # if data is not numbers replace by range
-            if x.dtype != 'float' and x.dtype != 'int':
-                x = np.arange(0, x.shape[0])
-        else:
-            x = 0 * np.ones(self.point_num)
-            
-        if not isinstance(self.y,int):
-            
-            # convert to array in case is dataframe
-            y = np.array(self.y)
-            
-            # if data is not numbers replace by range
-            if y.dtype != 'float' and y.dtype != 'int':
-                y = np.arange(0, y.shape[0])
-        else:
-            y = 0 * np.ones(self.point_num)
-            
-        if not (type(self.z) is int):
+    def extend(self, x=None, y=None, z=None, rescale=None):
+        """ Append points. Values must be given for every axis the trace has data for.
+            The statistics are updated from the new points only. A drawn trace is redrawn,
+            by default with the rescale value it was drawn with. """
+        
+        added = {}
+        for name, values in (('x', x), ('y', y), ('z', z)):
             
-            # convert to array in case is dataframe
-            z = np.array(self.z)
+            if isinstance(getattr(self, name), int):
+                if values is not None:
+                    raise ValueError(f"Trace has no {name} data to extend")
+                continue
+            if values is None:
+                raise ValueError(f"No {name} values given")
             
-            # if data is not numbers replace by range
-            if z.dtype != 'float' and z.dtype != 'int':
-                z = np.arange(0, z.shape[0])
-        else:
-            z = 0 * np.ones(self.point_num)
+            added[name] = numeric_array(values)
+        
+        lengths = {len(values) for values in added.values()}
+        if len(lengths) != 1:
+            raise ValueError("Lengths of the appended values do not match")
+        count = lengths.pop()
+        
+        for name, values in added.items():
+            setattr(self, name, np.concatenate((numeric_array(getattr(self, name)), values)))
+        self.point_num += count
+        
+        self.statistics.append(*[added.get(name, np.zeros(count)) for name in 'xyz'])
+        self._set_bounds()
+        
+        if getattr(self, 'mesh_object', None) is None:
+            return self.merged.update_trace(self) if self.merged is not None else None
+        
+        self.clear()
+        return self.draw(rescale=self.rescale if rescale is None else rescale)
+
+    def _get_xyz(self, rescale=True):
+
+        # convert to arrays in case of dataframe columns, missing axes are set to zero
+        x, y, z = [
+                    numeric_array(values) if not isinstance(values, int) else np.zeros(self.point_num)
+                    for values in (self.x, self.y, self.z)
+                ]
 
         if rescale:
-            x, y, z = rescale_xyz(x, y, z)
-            bounds = Bounds._from_xyz(x, y, z)
-            self.bounds.rescaled = bounds
+            x, y, z = rescale_xyz(x, y, z, bounds=self.statistics.bounds)
+            self._set_rescaled_bounds()
 
         return x, y, z
     
@@ -118,6 +160,7 @@ class Scatter(Trace):
         
         # add a text obect to put geometry nodes on
         labels_object = add_text(self.name + " ZLabels", name=self.name + " ZLabels")
+        self.registry.register(collection, labels_object, *collection.objects)
         
         
         if 'ZLabels' not in bpy.data.node_groups:
@@ -143,6 +186,7 @@ class Scatter(Trace):
         
         # add a text obect to put geometry nodes on
         labels_object = add_text(self.name + " XLabels", name=self.name + " XLabels")
+        self.registry.register(collection, labels_object, *collection.objects)
         
         
         if 'XLabels' not in bpy.data.node_groups:
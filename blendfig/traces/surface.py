@@ -1,8 +1,10 @@
 from .trace import Trace
-from ..bounds.bounds import Bounds
-from ..geometry.geometry import add_grid, surface_from_grid, make_mesh_curve
+from ..geometry.geometry import (
+    add_grid, surface_arrays, surface_normals, set_smooth_normals, mesh_from_arrays, surface_from_grid, make_mesh_curve
+)
 from ..materials.colors import color_cycle
-from ..tools.functions import rescale_xyz
+from ..tools.functions import rescale_xyz, sample_function, nan_filled
+from ..tools.marching import contour_lines
 import numpy as np
 import bpy
 
@@ -13,19 +15,21 @@ class Surface(Trace):
     
     def __init__(
                     self, x=None, y=None, z=None, name="Surface", color=None,
-                    mesh=True, mesh_skip='auto', mesh_thickness = .002, mesh_color=(0,0,0,1)
+                    mesh=True, mesh_skip='auto', mesh_thickness = .002, mesh_color=(0,0,0,1),
+                    contours=None, contours_floor=False, contour_color=(0,0,0,1), smooth=True
                 ):
         
+        super().__init__()
+        
         # save input data
         self.x = np.array(x)
         self.y = np.array(y)
-        self.z = np.array(z)
+        self.z = nan_filled(z) # NaN or masked values leave holes in the surface
 
         # check and process input
         self._check_input()
         
-        # get bounds
-        self.bounds = Bounds._from_object(self)
+        self._set_statistics(self.x, self.y, self.z)
         
         # name
         if name == "Surface":
@@ -45,30 +49,54 @@ class Surface(Trace):
         self.mesh_color = mesh_color
         self.mesh_thickness = mesh_thickness
         
-    def draw(self, mesh=True, rescale=True):
+        # save contour parameters
+        self.contours = contours # number of levels or list of levels
+        self.contours_floor = contours_floor # whether to also project the contours onto the floor
+        self.contour_color = contour_color
+        
+        self.smooth = smooth # smooth shading with normals computed from the grid
+        
+    @classmethod
+    def from_function(cls, f, x=(-1, 1), y=(-1, 1), samples=51, tolerance=None, max_refinements=6, **kwargs):
+        """ Create the surface z = f(x, y). f is evaluated on whole coordinate arrays.
+            If tolerance is given the grid is refined where f varies strongly, see tools.functions.sample_function.
+            Remaining keyword arguments are passed on to Surface. """
+        
+        x, y, z = sample_function(f, x, y, samples=samples, tolerance=tolerance, max_refinements=max_refinements)
         
-        x_sub, y_sub = self.z.shape
+        return cls(x=x, y=y, z=z, **kwargs)
         
-        bounds = self.bounds
+    def draw(self, mesh=True, rescale=True):
+        
+        self.rescale = rescale # reused by update
         if rescale:
-            x, y, z = rescale_xyz(self.x, self.y, self.z)
-            bounds = Bounds._from_xyz(x, y, z)
-            self.bounds.rescaled = bounds
+            x, y, z = rescale_xyz(self.x, self.y, self.z, bounds=self.statistics.bounds)
+            self._set_rescaled_bounds()
         else:
             x, y, z = self.x, self.y, self.z
 
-        add_grid(x=bounds.x, y=bounds.y, subdivisions=(x_sub-1, y_sub-1))
-        surface_from_grid(z)
+        # only complete cells are built, vertex_index maps the mesh vertices to the grid
+        vertices, faces, self.vertex_index = surface_arrays(x, y, z)
+        object = mesh_from_arrays(self.name, vertices, faces=faces)
+        if self.smooth:
+            set_smooth_normals(object.data, surface_normals(x, y, z)[self.vertex_index])
         
-        # rename object and mesh
-        object = bpy.context.object
-        object.name = self.name
-        object.data.name = self.name
+        # make the surface the only selected and active object
+        for selected in bpy.context.selected_objects:
+            selected.select_set(False)
+        object.select_set(True)
+        bpy.context.view_layer.objects.active = object
         
         # create and assign material
         material = bpy.data.materials.new(self.name)
         material.diffuse_color = self.color
         object.data.materials.append(material)
+        self.registry.register(object, material)
+        self.mesh_object = object
+        
+        # create contours
+        if self.contours is not None:
+            self.draw_contours(x, y, (self.bounds.rescaled if rescale else self.bounds).z)
                 
         # create mesh
         if self.mesh and mesh:
@@ -80,12 +108,98 @@ class Surface(Trace):
             # create mesh material
             material = bpy.data.materials.new(self.name + ' Mesh')
             material.diffuse_color = self.mesh_color
+            self.registry.register(material)
+            
+            # skip grid lines which do not border any complete cell
+            finite = np.isfinite(z)
+            cells = finite[:-1, :-1] & finite[1:, :-1] & finite[1:, 1:] & finite[:-1, 1:]
+            x_lines, y_lines = np.zeros(len(x), dtype=bool), np.zeros(len(y), dtype=bool)
+            x_lines[:-1] |= cells.any(axis=1)
+            x_lines[1:] |= cells.any(axis=1)
+            y_lines[:-1] |= cells.any(axis=0)
+            y_lines[1:] |= cells.any(axis=0)
                             
-            for x_ in x[::self.mesh_skip]:
-                make_mesh_curve(x=x_, bevel=self.mesh_thickness, material=material)
+            for x_ in x[::self.mesh_skip][x_lines[::self.mesh_skip]]:
+                self.registry.register(make_mesh_curve(x=x_, bevel=self.mesh_thickness, material=material))
                 
-            for y_ in y[::self.mesh_skip]:
-                make_mesh_curve(y=y_, bevel=self.mesh_thickness, material=material) 
+            for y_ in y[::self.mesh_skip][y_lines[::self.mesh_skip]]:
+                self.registry.register(make_mesh_curve(y=y_, bevel=self.mesh_thickness, material=material))
+
+    def update(self, z, rescale=None):
+        """ Replace the z data. If the surface has been drawn and the grid is unchanged the heights are rewritten in bulk,
+            otherwise the surface is redrawn. Contours and mesh lines are only updated on redraw.
+            rescale defaults to the value the surface was drawn with. """
+        
+        z = nan_filled(z)
+        same_grid = z.shape == self.z.shape and np.array_equal(np.isnan(z), np.isnan(self.z))
+        self.z = z
+        self._set_statistics(self.x, self.y, self.z)
+        
+        if getattr(self, 'mesh_object', None) is None:
+            return None
+        
+        if rescale is None:
+            rescale = self.rescale
+        
+        if not same_grid:
+            self.clear()
+            return self.draw(rescale=rescale)
+        
+        if rescale:
+            x, y, z = rescale_xyz(self.x, self.y, self.z, bounds=self.statistics.bounds)
+        else:
+            x, y = self.x, self.y
+        
+        mesh = self.mesh_object.data
+        co = np.empty(3 * len(mesh.vertices), dtype=np.float32)
+        mesh.vertices.foreach_get('co', co)
+        co[2::3] = z.T.ravel()[self.vertex_index]
+        mesh.vertices.foreach_set('co', co)
+        mesh.update()
+        
+        if self.smooth:
+            set_smooth_normals(mesh, surface_normals(x, y, z)[self.vertex_index])
+        
+        return self.mesh_object
+        
+    def draw_contours(self, x, y, z_range):
+        """ Draw all contour levels as a single mesh object of edges with a 'level' edge attribute.
+            x, y and z_range are the (possibly rescaled) axis values and z range the surface was drawn with. """
+        
+        # evenly spaced levels strictly inside the z range if only the number is given
+        zmin, zmax = self.bounds.z
+        if np.ndim(self.contours) == 0:
+            levels = np.linspace(zmin, zmax, int(self.contours) + 2)[1:-1]
+        else:
+            levels = np.asarray(self.contours, dtype=float)
+        
+        vertices, edges, edge_levels = contour_lines(self.z, levels)
+        
+        # map from index coordinates and data levels to drawn coordinates
+        vertices[:, 0] = np.interp(vertices[:, 0], np.arange(len(x)), x)
+        vertices[:, 1] = np.interp(vertices[:, 1], np.arange(len(y)), y)
+        vertices[:, 2] = np.interp(vertices[:, 2], (zmin, zmax), z_range)
+        
+        # floor projection as a copy of the contours at the bottom of the surface
+        if self.contours_floor:
+            floor = vertices.copy()
+            floor[:, 2] = z_range[0]
+            edges = np.concatenate((edges, edges + len(vertices)))
+            edge_levels = np.concatenate((edge_levels, edge_levels))
+            vertices = np.concatenate((vertices, floor))
+        
+        object = mesh_from_arrays(self.name + ' Contours', vertices, edges=edges)
+        object.data.attributes.new('level', 'FLOAT', 'EDGE').data.foreach_set('value', edge_levels)
+        
+        # create and assign material
+        material = bpy.data.materials.new(self.name + ' Contours')
+        material.diffuse_color = self.contour_color
+        object.data.materials.append(material)
+        self.registry.register(object, material)
+        
+        self.contour_object = object
+        
+        return object
 
     def _check_input(self):
         """ Determine input type and check for validity """
@@ -101,7 +215,7 @@ class Surface(Trace):
             raise ValueError("Too many dimensions. y should have dimension 1 for list/array or 2 for numpy's mgrid.")
 
         # ensure z data, if no x or y replace with integer ranges
-        if not self.z.any():
+        if self.z.ndim != 2 or np.isnan(self.z).all():
             raise ValueError("No z data given")
         if not self.x.any():
             self.x = np.arange(len(self.z))
@@ -1,7 +1,44 @@
+from ..bounds.bounds import Bounds
+from ..bounds.statistics import Statistics
+from ..registry.registry import Registry
+from ..tools.functions import rescaled_bounds
+
 class Trace:
     """ Trace prototype """
 
-    def __init__(self):
+    def __init__(self, color=None):
+
+        self.color = color # if None the figure assigns one from its color cycle
+        self.registry = Registry() # datablocks created when drawing
+
+    def clear(self):
+        """ Remove everything the trace has drawn. Returns a report of the removed datablocks. """
+
+        report = self.registry.clear()
+        self._forget_drawn()
+
+        return report
+
+    def _set_statistics(self, *xyz):
+        """ Compute the statistics of the data once, bounds and rescaling are derived from them """
+
+        self.statistics = Statistics.from_xyz(*xyz)
+        self._set_bounds()
+
+    def _set_bounds(self):
+        """ Bounds from the cached statistics, the rescaled bounds are kept if the trace was drawn rescaled """
+
+        rescaled = hasattr(getattr(self, 'bounds', None), 'rescaled')
+        self.bounds = Bounds._from_statistics(self.statistics)
+        if rescaled:
+            self._set_rescaled_bounds()
+
+    def _set_rescaled_bounds(self):
+
+        self.bounds.rescaled = Bounds(rescaled_bounds(self.statistics.bounds))
+
+    def _forget_drawn(self):
+        """ Drop the references to drawn objects, which are invalid once the objects are removed """
 
-        self.color = (1.,.24, .035, .75)
-        print("success")
\ No newline at end of file
+        self.mesh_object = None
+        self.contour_object = None